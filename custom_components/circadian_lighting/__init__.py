@@ -27,21 +27,28 @@ Technical notes: I had to make a lot of assumptions when writing this app
         lights to 2700K (warm white) until your hub goes into Night mode
 """
 
+import asyncio
 import bisect
+import logging
 from datetime import timedelta
 
 import homeassistant.helpers.config_validation as cv
 import homeassistant.util.dt as dt_util
 import voluptuous as vol
 from homeassistant.components.light import ATTR_TRANSITION, VALID_TRANSITION
+from homeassistant.components.light import DOMAIN as LIGHT_DOMAIN
 from homeassistant.const import (
+    ATTR_ENTITY_ID,
     CONF_ELEVATION,
     CONF_LATITUDE,
     CONF_LONGITUDE,
+    ENTITY_MATCH_ALL,
+    SERVICE_TURN_ON,
     SUN_EVENT_SUNRISE,
     SUN_EVENT_SUNSET,
 )
 from homeassistant.const import __version__ as HA_VERSION
+from homeassistant.core import callback
 from homeassistant.helpers.discovery import async_load_platform
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.event import (
@@ -50,14 +57,14 @@ from homeassistant.helpers.event import (
     async_track_time_change,
     async_track_time_interval,
 )
+from homeassistant.helpers.service import async_extract_entity_ids
+from homeassistant.helpers.start import async_at_started
 from homeassistant.helpers.sun import get_astral_location
-from homeassistant.util.color import (
-    color_RGB_to_xy,
-    color_temperature_to_rgb,
-    color_xy_to_hs,
-)
+from homeassistant.util.color import color_temperature_to_rgb, color_xy_to_hs
 from packaging import version
 
+_LOGGER = logging.getLogger(__name__)
+
 DOMAIN = "circadian_lighting"
 CIRCADIAN_LIGHTING_UPDATE_TOPIC = f"{DOMAIN}_update"
 SUN_EVENT_NOON = "solar_noon"
@@ -71,6 +78,8 @@ CONF_SUNSET_OFFSET = "sunset_offset"
 CONF_SUNRISE_TIME = "sunrise_time"
 CONF_SUNSET_TIME = "sunset_time"
 DEFAULT_TRANSITION = 60
+# How long a priority tier may take before the next one is sent anyway.
+LIGHT_TIER_TIMEOUT = 5
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -99,6 +108,10 @@ CONFIG_SCHEMA = vol.Schema(
     extra=vol.ALLOW_EXTRA,
 )
 
+TURN_ON_SCHEMA = cv.make_entity_service_schema(
+    {vol.Optional(ATTR_TRANSITION): VALID_TRANSITION}
+)
+
 REQUIRED_HA_VERSION = "2024.1.0"
 
 if version.parse(HA_VERSION) < version.parse(REQUIRED_HA_VERSION):
@@ -121,6 +134,27 @@ async def async_setup(hass, config) -> bool:
         transition=conf.get(ATTR_TRANSITION),
     )
     await hass.data[DOMAIN]._async_init(interval=conf.get(CONF_INTERVAL))
+    # Switches register their lights while the platforms are set up, so
+    # only report lights shared between switches once they all exist.
+    async_at_started(hass, hass.data[DOMAIN]._async_warn_light_conflicts)
+
+    async def async_turn_on(call) -> None:
+        """Turn lights on at their circadian values."""
+        if call.data.get(ATTR_ENTITY_ID) == ENTITY_MATCH_ALL:
+            lights = hass.states.async_entity_ids(LIGHT_DOMAIN)
+        else:
+            lights = [
+                entity_id
+                for entity_id in await async_extract_entity_ids(hass, call)
+                if entity_id.startswith(f"{LIGHT_DOMAIN}.")
+            ]
+        await hass.data[DOMAIN].async_turn_on_lights(
+            lights, call.data.get(ATTR_TRANSITION)
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_TURN_ON, async_turn_on, schema=TURN_ON_SCHEMA
+    )
     hass.async_create_task(
         async_load_platform(hass, "sensor", DOMAIN, {}, config)
     )
@@ -128,6 +162,24 @@ async def async_setup(hass, config) -> bool:
     return True
 
 
+def color_temperature_to_xy(kelvin):
+    """Return the CIE 1931 xy chromaticity of a black body at kelvin.
+
+    Uses Krystek's rational approximation of the Planckian locus in CIE 1960
+    uv, valid from 1000 K to 15000 K. Unlike going through
+    color_temperature_to_rgb, nothing is clipped at the warm end.
+    """
+    t = min(max(kelvin, 1000), 15000)
+    u = (0.860117757 + 1.54118254e-4 * t + 1.28641212e-7 * t * t) / (
+        1 + 8.42420235e-4 * t + 7.08145163e-7 * t * t
+    )
+    v = (0.317398726 + 4.22806245e-5 * t + 4.20481691e-8 * t * t) / (
+        1 - 2.89741816e-5 * t + 1.61456053e-7 * t * t
+    )
+    d = 2 * u - 8 * v + 4
+    return round(3 * u / d, 4), round(2 * v / d, 4)
+
+
 class CircadianLighting:
     """Calculate universal Circadian values."""
 
@@ -156,12 +208,14 @@ class CircadianLighting:
         self._longitude = longitude
         self._elevation = elevation
         self._transition = transition
+        self._update_task = None
+        self._light_commands = []
+        self._light_owners = {}
+        self._conflicts_warned = set()
+        self._started = False
 
     async def _async_init(self, interval):
-        self._percent = await self.async_calc_percent()
-        self._colortemp = await self.async_calc_colortemp()
-        self._rgb_color = await self.async_calc_rgb()
-        self._xy_color = await self.async_calc_xy()
+        await self._async_calc_values()
 
         if self._manual_sunrise is not None:
             async_track_time_change(
@@ -271,7 +325,7 @@ class CircadianLighting:
         # We're also generating a different parabola for sunrise-sunset.
 
         # sunrise -> sunset parabola
-        if today[SUN_EVENT_SUNRISE] < now_ts < today[SUN_EVENT_SUNSET]:
+        if today[SUN_EVENT_SUNRISE] <= now_ts < today[SUN_EVENT_SUNSET]:
             h = today[SUN_EVENT_NOON]
             k = 100
             # parabola before solar_noon else after solar_noon
@@ -282,7 +336,7 @@ class CircadianLighting:
             )
 
         # sunset -> sunrise parabola
-        elif today[SUN_EVENT_SUNSET] < now_ts < today[SUN_EVENT_SUNRISE]:
+        elif today[SUN_EVENT_SUNSET] <= now_ts < today[SUN_EVENT_SUNRISE]:
             h = today[SUN_EVENT_MIDNIGHT]
             k = -100
             # parabola before solar_midnight else after solar_midnight
@@ -297,30 +351,198 @@ class CircadianLighting:
         percentage = a * (now_ts - h) ** 2 + k
         return percentage
 
-    async def async_calc_colortemp(self):
-        if self._percent > 0:
+    async def async_calc_colortemp(self, percent=None):
+        if percent is None:
+            percent = self._percent
+        if percent > 0:
             delta = self._max_colortemp - self._min_colortemp
-            percent = self._percent / 100
+            percent = percent / 100
             return (delta * percent) + self._min_colortemp
         else:
             return self._min_colortemp
 
-    async def async_calc_rgb(self):
-        return await self.hass.async_add_executor_job(color_temperature_to_rgb, self._colortemp)
+    async def async_calc_rgb(self, colortemp=None):
+        if colortemp is None:
+            colortemp = self._colortemp
+        return await self.hass.async_add_executor_job(color_temperature_to_rgb, colortemp)
 
-    async def async_calc_xy(self):
-        rgb = await self.async_calc_rgb()
-        return await self.hass.async_add_executor_job(color_RGB_to_xy, *rgb)
+    async def async_calc_xy(self, colortemp=None):
+        if colortemp is None:
+            colortemp = self._colortemp
+        return await self.hass.async_add_executor_job(color_temperature_to_xy, colortemp)
 
-    async def async_calc_hs(self):
-        xy = await self.async_calc_xy()
+    async def async_calc_hs(self, colortemp=None):
+        xy = await self.async_calc_xy(colortemp)
         return await self.hass.async_add_executor_job(color_xy_to_hs, *xy)
 
+    async def _async_calc_values(self):
+        # Compute into locals and assign together after the last await, so
+        # nothing reading these fields meanwhile sees a half-updated snapshot.
+        percent = await self.async_calc_percent()
+        colortemp = await self.async_calc_colortemp(percent)
+        rgb_color = await self.async_calc_rgb(colortemp)
+        xy_color = await self.async_calc_xy(colortemp)
+        hs_color = await self.async_calc_hs(colortemp)
+        self._percent = percent
+        self._colortemp = colortemp
+        self._rgb_color = rgb_color
+        self._xy_color = xy_color
+        self._hs_color = hs_color
+
+    async def _async_update_values(self):
+        await self._async_calc_values()
+        async_dispatcher_send(self.hass, CIRCADIAN_LIGHTING_UPDATE_TOPIC)
+
+    def async_register_lights(self, switch):
+        """Add switch to the ownership index of each of its lights.
+
+        A light listed in several switches is adjusted only by the one with
+        the highest priority among those that are currently adjusting; ties
+        go to the switch whose entity ID sorts first. Returns a callable
+        that removes the switch from the index again.
+        """
+        entry = (-switch._priority, switch.entity_id, switch)
+        for light in switch._lights:
+            owners = self._light_owners.setdefault(light, [])
+            owners.append(entry)
+            owners.sort(key=lambda owner: owner[:2])
+        if self._started:
+            self._async_warn_light_conflicts()
+
+        def unregister():
+            for light in switch._lights:
+                self._light_owners[light].remove(entry)
+
+        return unregister
+
+    @callback
+    def _async_warn_light_conflicts(self, _=None):
+        """Warn once per light that is shared by several switches."""
+        self._started = True
+        for light, owners in self._light_owners.items():
+            if len(owners) > 1 and light not in self._conflicts_warned:
+                self._conflicts_warned.add(light)
+                _LOGGER.warning(
+                    "%s is controlled by %s; %s takes precedence",
+                    light,
+                    ", ".join(owner.entity_id for _, _, owner in owners),
+                    owners[0][2].entity_id,
+                )
+
+    def light_owner(self, light):
+        """Return the switch that currently adjusts light, if any."""
+        for _, _, switch in self._light_owners.get(light, ()):
+            if switch._should_adjust():
+                return switch
+        return None
+
+    async def async_turn_on_lights(self, lights, transition=None):
+        """Turn lights on in one call each, already at circadian values.
+
+        Lights with the same switch and type share a call. Lights that no
+        active switch adjusts are turned on as they are.
+        """
+        calls = {}
+        for light in lights:
+            switch = self.light_owner(light)
+            if switch is None:
+                key = None
+                service_data = {}
+                if transition is not None:
+                    service_data[ATTR_TRANSITION] = transition
+            else:
+                key = (id(switch), switch._lights_types[light])
+                service_data = {
+                    ATTR_TRANSITION: switch._initial_transition
+                    if transition is None
+                    else transition,
+                    **switch._prepare_turn_on(light),
+                }
+            call, _ = calls.setdefault(
+                key, ({**service_data, ATTR_ENTITY_ID: []}, switch)
+            )
+            call[ATTR_ENTITY_ID].append(light)
+
+        tasks = {
+            self.hass.async_create_task(
+                self.hass.services.async_call(
+                    LIGHT_DOMAIN, SERVICE_TURN_ON, service_data, blocking=True
+                ),
+                eager_start=True,
+            ): (service_data, switch)
+            for service_data, switch in calls.values()
+        }
+        pending = [task for task in tasks if not task.done()]
+        if pending:
+            await asyncio.wait(pending, timeout=LIGHT_TIER_TIMEOUT)
+        for task, (service_data, switch) in tasks.items():
+            if not task.done() or task.exception() is None:
+                continue
+            _LOGGER.error(
+                "Error turning on %s: %s", service_data[ATTR_ENTITY_ID], task.exception()
+            )
+            if switch is not None:
+                # These lights stay off, so a later manual turn-on must be
+                # corrected as usual.
+                for light in service_data[ATTR_ENTITY_ID]:
+                    switch._turn_on_pending.pop(light, None)
+
+    async def async_send_light_commands(self, calls):
+        """Send light.turn_on calls, given as (priority, service_data) pairs.
+
+        Calls queued by all switches during the same dispatch are sent
+        together, highest priority tier first. Each tier is sent blocking and
+        the next one starts once every call in it has been handled, or after
+        LIGHT_TIER_TIMEOUT seconds if some light does not respond.
+        """
+        done = self.hass.loop.create_future()
+        if not self._light_commands:
+            self.hass.async_create_task(self._async_send_light_commands())
+        self._light_commands.append((calls, done))
+        await done
+
+    async def _async_send_light_commands(self):
+        # Let the other dispatcher targets queue their calls first. Calls
+        # queued after this batch is taken start a batch of their own, so a
+        # light that never answers cannot hold up later updates.
+        await asyncio.sleep(0)
+        batch, self._light_commands = self._light_commands, []
+        tiers = {}
+        for calls, _ in batch:
+            for priority, service_data in calls:
+                tiers.setdefault(priority, []).append(service_data)
+        try:
+            for priority in sorted(tiers, reverse=True):
+                tasks = [
+                    self.hass.async_create_task(
+                        self._async_send_light_command(service_data),
+                        eager_start=True,
+                    )
+                    for service_data in tiers[priority]
+                ]
+                pending = [task for task in tasks if not task.done()]
+                if pending:
+                    await asyncio.wait(pending, timeout=LIGHT_TIER_TIMEOUT)
+        finally:
+            for _, done in batch:
+                if not done.done():
+                    done.set_result(None)
+
+    async def _async_send_light_command(self, service_data):
+        try:
+            await self.hass.services.async_call(
+                LIGHT_DOMAIN, SERVICE_TURN_ON, service_data, blocking=True
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error adjusting %s: %s", service_data[ATTR_ENTITY_ID], err)
+
     async def async_update(self, _=None):
         """Update Circadian Values."""
-        self._percent = await self.async_calc_percent()
-        self._colortemp = await self.async_calc_colortemp()
-        self._rgb_color = await self.async_calc_rgb()
-        self._xy_color = await self.async_calc_xy()
-        self._hs_color = await self.async_calc_hs()
-        async_dispatcher_send(self.hass, CIRCADIAN_LIGHTING_UPDATE_TOPIC)
+        # The interval timer, the sun event trackers and the values_update
+        # service can all fire at once. Triggers arriving while an update is
+        # in flight join it, so the switches are dispatched once per snapshot.
+        if self._update_task is None or self._update_task.done():
+            self._update_task = self.hass.async_create_task(
+                self._async_update_values()
+            )
+        await asyncio.shield(self._update_task)
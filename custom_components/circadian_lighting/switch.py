@@ -2,9 +2,7 @@
 Circadian Lighting Switch for Home-Assistant.
 """
 
-import asyncio
 import logging
-from itertools import repeat
 
 import homeassistant.helpers.config_validation as cv
 import voluptuous as vol
@@ -31,13 +29,9 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.util import slugify
-from homeassistant.util.color import (
-    color_RGB_to_xy,
-    color_temperature_to_rgb,
-    color_xy_to_hs,
-)
+from homeassistant.util.color import color_temperature_to_rgb, color_xy_to_hs
 
-from . import CIRCADIAN_LIGHTING_UPDATE_TOPIC, DOMAIN
+from . import CIRCADIAN_LIGHTING_UPDATE_TOPIC, DOMAIN, color_temperature_to_xy
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -58,6 +52,14 @@ CONF_DISABLE_ENTITY = "disable_entity"
 CONF_DISABLE_STATE = "disable_state"
 CONF_INITIAL_TRANSITION, DEFAULT_INITIAL_TRANSITION = "initial_transition", 1
 CONF_ONLY_ONCE = "only_once"
+# How long a light turned on by circadian_lighting.turn_on may take to report
+# it is on before its usual turn-on correction is no longer skipped.
+TURN_ON_TIMEOUT = 10
+
+CONF_PRIORITY, DEFAULT_PRIORITY = "priority", 0
+CONF_PRIORITY_LIGHTS = "priority_lights"
+CONF_OCCUPANCY_ENTITY = "occupancy_entity"
+CONF_OCCUPANCY_STATE, DEFAULT_OCCUPANCY_STATE = "occupancy_state", [STATE_ON]
 
 PLATFORM_SCHEMA = vol.Schema(
     {
@@ -88,6 +90,12 @@ PLATFORM_SCHEMA = vol.Schema(
             CONF_INITIAL_TRANSITION, default=DEFAULT_INITIAL_TRANSITION
         ): VALID_TRANSITION,
         vol.Optional(CONF_ONLY_ONCE, default=False): cv.boolean,
+        vol.Optional(CONF_PRIORITY, default=DEFAULT_PRIORITY): vol.Coerce(int),
+        vol.Optional(CONF_PRIORITY_LIGHTS): cv.entity_ids,
+        vol.Optional(CONF_OCCUPANCY_ENTITY): cv.entity_id,
+        vol.Optional(
+            CONF_OCCUPANCY_STATE, default=DEFAULT_OCCUPANCY_STATE
+        ): vol.All(cv.ensure_list, [cv.string]),
     }
 )
 
@@ -115,6 +123,10 @@ def setup_platform(hass, config, add_devices, discovery_info=None):
             disable_state=config.get(CONF_DISABLE_STATE),
             initial_transition=config.get(CONF_INITIAL_TRANSITION),
             only_once=config.get(CONF_ONLY_ONCE),
+            priority=config.get(CONF_PRIORITY),
+            priority_lights=config.get(CONF_PRIORITY_LIGHTS, []),
+            occupancy_entity=config.get(CONF_OCCUPANCY_ENTITY),
+            occupancy_state=config.get(CONF_OCCUPANCY_STATE),
         )
         add_devices([switch])
 
@@ -179,6 +191,10 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
         disable_state,
         initial_transition,
         only_once,
+        priority,
+        priority_lights,
+        occupancy_entity,
+        occupancy_state,
     ):
         """Initialize the Circadian Lighting switch."""
         self.hass = hass
@@ -200,11 +216,33 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
         self._disable_state = disable_state
         self._initial_transition = initial_transition
         self._only_once = only_once
-        self._lights_types = dict(zip(lights_ct, repeat("ct")))
-        self._lights_types.update(zip(lights_rgb, repeat("rgb")))
-        self._lights_types.update(zip(lights_xy, repeat("xy")))
-        self._lights_types.update(zip(lights_brightness, repeat("brightness")))
+        self._priority = priority
+        self._priority_lights = set(priority_lights)
+        self._occupancy_entity = occupancy_entity
+        self._occupancy_state = occupancy_state
+        self._lights_types = {}
+        for light_type, lights in (
+            ("ct", lights_ct),
+            ("rgb", lights_rgb),
+            ("xy", lights_xy),
+            ("brightness", lights_brightness),
+        ):
+            for light in lights:
+                previous_type = self._lights_types.get(light, light_type)
+                if previous_type != light_type:
+                    _LOGGER.warning(
+                        "%s is listed as both %s and %s in %s; using %s",
+                        light,
+                        previous_type,
+                        light_type,
+                        name,
+                        light_type,
+                    )
+                self._lights_types[light] = light_type
         self._lights = list(self._lights_types.keys())
+        self._payloads = {}
+        self._payloads_key = None
+        self._turn_on_pending = {}
 
     @property
     def entity_id(self):
@@ -230,6 +268,8 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
             )
         )
 
+        self.async_on_remove(self._circadian_lighting.async_register_lights(self))
+
         # Add listeners
         async_track_state_change_event(
             self.hass, self._lights, self._light_state_changed
@@ -274,6 +314,7 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
         self._state = False
         self._hs_color = None
         self._brightness = None
+        self._payloads_key = None
 
     def _is_sleep(self):
         return (
@@ -288,15 +329,6 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
             else self._sleep_colortemp
         )
 
-    def _calc_rgb(self):
-        return color_temperature_to_rgb(self._color_temperature())
-
-    def _calc_xy(self):
-        return color_RGB_to_xy(*self._calc_rgb())
-
-    def _calc_hs(self):
-        return color_xy_to_hs(*self._calc_xy())
-
     def _calc_brightness(self) -> float:
         if self._disable_brightness_adjust:
             return
@@ -308,16 +340,53 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
         percent = (100 + self._circadian_lighting._percent) / 100
         return (delta_brightness * percent) + self._min_brightness
 
-    async def _update_switch(self, lights=None, transition=None, force=False):
+    def _build_payloads(self):
+        color_temperature = self._color_temperature()
+        rgb = color_temperature_to_rgb(color_temperature)
+        xy = color_temperature_to_xy(color_temperature)
+        base = {}
+        if self._brightness is not None:
+            base[ATTR_BRIGHTNESS] = int((self._brightness / 100) * 254)
+        return {
+            "ct": {**base, ATTR_COLOR_TEMP_KELVIN: int(color_temperature)},
+            "rgb": {**base, ATTR_RGB_COLOR: tuple(int(c) for c in rgb)},
+            "xy": {**base, ATTR_XY_COLOR: xy},
+            "brightness": base,
+        }
+
+    def _refresh_payloads(self):
+        """Rebuild the per-type service data if the snapshot or sleep state changed."""
+        key = (
+            self._circadian_lighting._colortemp,
+            self._circadian_lighting._percent,
+            self._is_sleep(),
+        )
+        if key != self._payloads_key:
+            self._brightness = self._calc_brightness()
+            self._payloads = self._build_payloads()
+            self._hs_color = color_xy_to_hs(*self._payloads["xy"][ATTR_XY_COLOR])
+            self._payloads_key = key
+
+    def _prepare_turn_on(self, light):
+        """Return the service data that turns light on at circadian values."""
+        self._refresh_payloads()
+        if not is_on(self.hass, light):
+            # The light is turned on at the right values, so the correction
+            # _light_state_changed would send is not needed.
+            self._turn_on_pending[light] = self.hass.loop.time() + TURN_ON_TIMEOUT
+        return self._payloads[self._lights_types[light]]
+
+    async def _update_switch(
+        self, lights=None, transition=None, force=False, immediate=False
+    ):
         if self._only_once and not force:
             return
-        self._hs_color = self._calc_hs()
-        self._brightness = self._calc_brightness()
-        await self._adjust_lights(lights or self._lights, transition)
+        self._refresh_payloads()
+        await self._adjust_lights(lights or self._lights, transition, immediate)
 
-    async def _force_update_switch(self, lights=None):
+    async def _force_update_switch(self, lights=None, immediate=False):
         return await self._update_switch(
-            lights, transition=self._initial_transition, force=True
+            lights, transition=self._initial_transition, force=True, immediate=immediate
         )
 
     def _is_disabled(self):
@@ -326,6 +395,12 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
             and self.hass.states.get(self._disable_entity).state in self._disable_state
         )
 
+    def _is_occupied(self):
+        if self._occupancy_entity is None:
+            return False
+        state = self.hass.states.get(self._occupancy_entity)
+        return state is not None and state.state in self._occupancy_state
+
     def _should_adjust(self):
         if self._state is not True:
             return False
@@ -333,44 +408,41 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
             return False
         return True
 
-    async def _adjust_lights(self, lights, transition):
+    async def _adjust_lights(self, lights, transition, immediate=False):
         if not self._should_adjust():
             return
 
         if transition is None:
             transition = self._circadian_lighting._transition
 
-        tasks = []
+        priority = self._priority + self._is_occupied()
+        calls = []
         for light in lights:
             if not is_on(self.hass, light):
                 continue
+            if self._circadian_lighting.light_owner(light) is not self:
+                continue
 
-            service_data = {ATTR_ENTITY_ID: light, ATTR_TRANSITION: transition}
-            if self._brightness is not None:
-                service_data[ATTR_BRIGHTNESS] = int((self._brightness / 100) * 254)
-
-            light_type = self._lights_types[light]
-            if light_type == "ct":
-                service_data[ATTR_COLOR_TEMP_KELVIN] = int(self._color_temperature())
-            elif light_type == "rgb":
-                r, g, b = self._calc_rgb()
-                service_data[ATTR_RGB_COLOR] = (int(r), int(g), int(b))
-            elif light_type == "xy":
-                service_data[ATTR_XY_COLOR] = self._calc_xy()
-
+            service_data = {
+                ATTR_ENTITY_ID: light,
+                ATTR_TRANSITION: transition,
+                **self._payloads[self._lights_types[light]],
+            }
             _LOGGER.debug(
                 "Scheduling 'light.turn_on' with the following 'service_data': %s",
                 service_data,
             )
-            tasks.append(
-                self.hass.async_create_task(
-                    self.hass.services.async_call(
-                        LIGHT_DOMAIN, SERVICE_TURN_ON, service_data
-                    )
+            calls.append((priority + (light in self._priority_lights), service_data))
+
+        if immediate:
+            # A light that was just turned on: skip the queue and send the
+            # correction straight away.
+            for _, service_data in calls:
+                await self.hass.services.async_call(
+                    LIGHT_DOMAIN, SERVICE_TURN_ON, service_data
                 )
-            )
-        if tasks:
-            await asyncio.wait(tasks)
+        elif calls:
+            await self._circadian_lighting.async_send_light_commands(calls)
 
     async def _light_state_changed(self, event: Event[EventStateChangedData]):
         entity_id = event.data["entity_id"]
@@ -382,8 +454,11 @@ class CircadianSwitch(SwitchEntity, RestoreEntity):
             return  # Exit early if new_state is None or not "on"
     
         if old_state is None or old_state.state != "on":
+            if self._turn_on_pending.pop(entity_id, 0) > self.hass.loop.time():
+                _LOGGER.debug("%s was turned on at circadian values", entity_id)
+                return
             _LOGGER.debug(_difference_between_states(old_state, new_state))
-            await self._force_update_switch(lights=[entity_id])
+            await self._force_update_switch(lights=[entity_id], immediate=True)
 
     async def _state_changed(self, event: Event[EventStateChangedData]):
         entity_id = event.data["entity_id"]
@@ -0,0 +1,133 @@
+"""
+Micro-benchmarks for Circadian Lighting.
+
+Run from the repository root with Home Assistant installed:
+
+    python scripts/benchmark.py
+"""
+
+import asyncio
+import math
+import statistics
+import time
+import timeit
+
+from fakes import (
+    STATE_OFF,
+    STATE_ON,
+    FakeHass,
+    make_circadian_lighting,
+    make_lights,
+    make_switch,
+    state_changed_event,
+)
+from homeassistant.util.color import color_RGB_to_xy, color_temperature_to_rgb
+
+from custom_components.circadian_lighting import color_temperature_to_xy
+
+TURN_ON_SAMPLES = 10000
+COLOR_LOOPS = 20000
+
+# CIE 1931 2-degree chromaticity of the Planckian locus.
+PLANCKIAN_LOCUS = {
+    1000: (0.6528, 0.3444),
+    1500: (0.5857, 0.3931),
+    2000: (0.5267, 0.4133),
+    2500: (0.4770, 0.4137),
+    3000: (0.4369, 0.4041),
+    3500: (0.4053, 0.3907),
+    4000: (0.3805, 0.3768),
+    5000: (0.3451, 0.3516),
+    6000: (0.3221, 0.3318),
+    6500: (0.3135, 0.3236),
+    7000: (0.3064, 0.3166),
+    8000: (0.2952, 0.3048),
+    10000: (0.2807, 0.2884),
+}
+
+
+async def bench_turn_on_traffic():
+    """Count the commands a manual turn-on costs with and without the service."""
+    hass = FakeHass()
+    lights = make_lights(hass, 4)
+    circadian_lighting = make_circadian_lighting(hass)
+    circadian_lighting._colortemp = 4000
+    circadian_lighting._percent = 50
+    switch = make_switch(hass, circadian_lighting, lights)
+    calls = hass.services.calls
+
+    for light in lights:
+        # light.turn_on at the previous values, then the switch's correction.
+        calls.append(("light", "turn_on", {"entity_id": light}))
+        await switch._light_state_changed(state_changed_event(hass, light, STATE_ON))
+        hass.states.async_set(light, STATE_OFF)
+    plain = len(calls)
+
+    calls.clear()
+    await circadian_lighting.async_turn_on_lights(lights)
+    for light in lights:
+        await switch._light_state_changed(state_changed_event(hass, light, STATE_ON))
+    print(
+        f"turn-on commands for {len(lights)} lights: light.turn_on {plain},"
+        f" circadian_lighting.turn_on {len(calls)}"
+    )
+
+
+def _rgb_chain_to_xy(kelvin):
+    return color_RGB_to_xy(*color_temperature_to_rgb(kelvin))
+
+
+def bench_kelvin_to_xy():
+    """Compare the direct Planckian conversion with the kelvin->RGB->xy chain."""
+    for name, func in (
+        ("rgb chain", _rgb_chain_to_xy),
+        ("planckian", color_temperature_to_xy),
+    ):
+        elapsed = timeit.timeit(
+            lambda func=func: [func(kelvin) for kelvin in PLANCKIAN_LOCUS],
+            number=COLOR_LOOPS,
+        )
+        per_call = elapsed / (COLOR_LOOPS * len(PLANCKIAN_LOCUS))
+        errors = {
+            kelvin: math.dist(func(kelvin), xy) for kelvin, xy in PLANCKIAN_LOCUS.items()
+        }
+        print(
+            f"kelvin->xy {name}: {per_call * 1e6:.2f} us/call,"
+            f" mean error {statistics.mean(errors.values()):.4f},"
+            f" max error {max(errors.values()):.4f}"
+            f" at {max(errors, key=errors.get)} K"
+        )
+
+
+async def bench_turn_on_latency():
+    """Time from a light's off->on state change to its correction being sent."""
+    hass = FakeHass()
+    lights = make_lights(hass, 4)
+    circadian_lighting = make_circadian_lighting(hass)
+    circadian_lighting._colortemp = 4000
+    circadian_lighting._percent = 50
+    switch = make_switch(hass, circadian_lighting, lights)
+    samples = []
+    for i in range(TURN_ON_SAMPLES):
+        light = lights[i % len(lights)]
+        state_changed_event(hass, light, STATE_OFF)
+        event = state_changed_event(hass, light, STATE_ON)
+        start = time.perf_counter()
+        await switch._light_state_changed(event)
+        samples.append(time.perf_counter() - start)
+    assert len(hass.services.calls) == TURN_ON_SAMPLES
+    print(
+        f"turn-on correction latency: median {statistics.median(samples) * 1e6:.1f} us,"
+        f" p95 {statistics.quantiles(samples, n=20)[-1] * 1e6:.1f} us"
+        f" ({TURN_ON_SAMPLES} samples)"
+    )
+
+
+async def main():
+    await bench_turn_on_latency()
+    await bench_turn_on_traffic()
+    bench_kelvin_to_xy()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
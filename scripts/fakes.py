@@ -0,0 +1,145 @@
+"""
+Minimal stand-ins for the parts of Home Assistant that Circadian Lighting
+touches, used by the scripts in this directory to drive the component
+outside of a running instance.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from homeassistant.const import STATE_OFF, STATE_ON
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+class FakeState:
+    def __init__(self, entity_id, state):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = {}
+
+
+class FakeStates:
+    def __init__(self):
+        self._states = {}
+
+    def get(self, entity_id):
+        return self._states.get(entity_id)
+
+    def is_state(self, entity_id, state):
+        current = self._states.get(entity_id)
+        return current is not None and current.state == state
+
+    def async_set(self, entity_id, state):
+        old_state = self._states.get(entity_id)
+        new_state = FakeState(entity_id, state)
+        self._states[entity_id] = new_state
+        return old_state, new_state
+
+
+class FakeServices:
+    def __init__(self):
+        self.calls = []
+
+    async def async_call(self, domain, service, service_data=None, **kwargs):
+        self.calls.append((domain, service, service_data))
+
+
+class FakeHass:
+    def __init__(self):
+        self.states = FakeStates()
+        self.services = FakeServices()
+        self.data = {}
+        self.config = SimpleNamespace(
+            latitude=52.37, longitude=4.89, elevation=0, time_zone="UTC", debug=False
+        )
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    def async_create_task(self, target, name=None, eager_start=True):
+        return asyncio.ensure_future(target)
+
+    async def async_add_executor_job(self, target, *args):
+        return target(*args)
+
+
+def state_changed_event(hass, entity_id, state):
+    """Set a state and return the matching state_changed event."""
+    old_state, new_state = hass.states.async_set(entity_id, state)
+    return SimpleNamespace(
+        data={"entity_id": entity_id, "old_state": old_state, "new_state": new_state}
+    )
+
+
+def make_lights(hass, count, state=STATE_OFF, prefix="bench"):
+    lights = [f"light.{prefix}_{i}" for i in range(count)]
+    for light in lights:
+        hass.states.async_set(light, state)
+    return lights
+
+
+def make_switch(hass, circadian_lighting, lights, **kwargs):
+    """Create an enabled switch, spreading the lights over the four types."""
+    from custom_components.circadian_lighting.switch import CircadianSwitch
+
+    config = {
+        "name": "Benchmark",
+        "lights_ct": lights[0::4],
+        "lights_rgb": lights[1::4],
+        "lights_xy": lights[2::4],
+        "lights_brightness": lights[3::4],
+        "disable_brightness_adjust": False,
+        "min_brightness": 1,
+        "max_brightness": 100,
+        "sleep_entity": None,
+        "sleep_state": None,
+        "sleep_colortemp": 1000,
+        "sleep_brightness": 1,
+        "disable_entity": None,
+        "disable_state": None,
+        "initial_transition": 1,
+        "only_once": False,
+        "priority": 0,
+        "priority_lights": [],
+        "occupancy_entity": None,
+        "occupancy_state": [STATE_ON],
+    }
+    config.update(kwargs)
+    switch = CircadianSwitch(hass, circadian_lighting, **config)
+    switch._state = True
+    circadian_lighting.async_register_lights(switch)
+    return switch
+
+
+def make_circadian_lighting(hass, **kwargs):
+    from custom_components.circadian_lighting import CircadianLighting
+
+    config = {
+        "min_colortemp": 2500,
+        "max_colortemp": 5500,
+        "sunrise_offset": None,
+        "sunset_offset": None,
+        "sunrise_time": None,
+        "sunset_time": None,
+        "latitude": hass.config.latitude,
+        "longitude": hass.config.longitude,
+        "elevation": hass.config.elevation,
+        "transition": 60,
+    }
+    config.update(kwargs)
+    return CircadianLighting(hass, **config)
+
+
+__all__ = [
+    "STATE_OFF",
+    "STATE_ON",
+    "FakeHass",
+    "make_circadian_lighting",
+    "make_lights",
+    "make_switch",
+    "state_changed_event",
+]
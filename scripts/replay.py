@@ -0,0 +1,310 @@
+"""
+Replay Circadian Lighting against a virtual clock.
+
+Sets up the component and the configured switches on a Home Assistant
+instance whose event loop runs on simulated time. The real interval and
+sunrise/sunset trackers, the update dispatcher and the switches' state
+listeners drive everything; fake lights follow daily on/off patterns and
+every light.turn_on they receive is counted.
+
+Run from the repository root with Home Assistant installed:
+
+    python scripts/replay.py --days 365 --lights 40
+    python scripts/replay.py --config replay.yaml --days 7
+
+The optional config file holds a `circadian_lighting` section, a list of
+`switches` (as in configuration.yaml, without `platform`) and `states`,
+entities switched on a daily schedule (times in UTC), e.g.:
+
+    circadian_lighting:
+      interval: 300
+    switches:
+      - name: Bedroom
+        lights_ct: [light.bedroom]
+        sleep_entity: input_boolean.sleep
+        sleep_state: "on"
+    states:
+      input_boolean.sleep: {"22:30": "on", "06:30": "off"}
+
+Lights in `states` follow that schedule; all other lights in the switches
+follow PATTERN.
+"""
+
+import argparse
+import asyncio
+import random
+import selectors
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import homeassistant.helpers.event as event_helper
+import homeassistant.util.dt as dt_util
+import yaml
+from homeassistant.const import EVENT_HOMEASSISTANT_STARTED, STATE_OFF, STATE_ON
+from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import custom_components.circadian_lighting as circadian_lighting_component  # noqa: E402
+from custom_components.circadian_lighting import (  # noqa: E402
+    CIRCADIAN_LIGHTING_UPDATE_TOPIC,
+    DOMAIN,
+)
+from custom_components.circadian_lighting import switch as switch_platform  # noqa: E402
+
+# Daily on/off windows (hours, UTC) that each fake light follows, with a
+# per-light, per-day jitter of up to JITTER minutes either way.
+PATTERN = [(6.5, 8.0), (17.5, 23.0)]
+JITTER = 45
+
+
+class _VirtualSelector(selectors.SelectSelector):
+    """Instead of waiting for the next timer, move the clock forward to it.
+
+    Nothing in the replay does I/O and executor jobs run inline, so there is
+    never a file descriptor worth polling.
+    """
+
+    def __init__(self, loop):
+        super().__init__()
+        self._loop = loop
+
+    def select(self, timeout=None):
+        if timeout:
+            self._loop.now += timeout
+        return []
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop whose time() is a simulated UNIX timestamp."""
+
+    def __init__(self, start):
+        self.now = start
+        super().__init__(_VirtualSelector(self))
+        # A nanosecond is below float precision at today's timestamps, so a
+        # timer due "now" would never count as due.
+        self._clock_resolution = 1e-6
+
+    def time(self):
+        return self.now
+
+    def run_in_executor(self, executor, func, *args):
+        """Run inline, so no work happens outside simulated time."""
+        future = self.create_future()
+        try:
+            future.set_result(func(*args))
+        except Exception as err:  # pylint: disable=broad-except
+            future.set_exception(err)
+        return future
+
+
+def _use_virtual_clock(loop):
+    def utcnow():
+        return datetime.fromtimestamp(loop.time(), dt_util.UTC)
+
+    def now(time_zone=None):
+        return utcnow().astimezone(time_zone or dt_util.DEFAULT_TIME_ZONE)
+
+    dt_util.utcnow = utcnow
+    dt_util.now = now
+    event_helper.time_tracker_utcnow = utcnow
+    event_helper.time_tracker_timestamp = loop.time
+    event_helper.time = SimpleNamespace(time=loop.time)
+
+
+def _cache_sun_events(circadian_lighting):
+    """Memoize sun events per day.
+
+    Every update asks astral for three days of events, which would
+    otherwise dominate the time a simulated year takes.
+    """
+    get_sun_events = circadian_lighting._async_get_sun_events
+    cache = {}
+
+    async def cached_sun_events(date):
+        key = date.date()
+        if key not in cache:
+            cache[key] = await get_sun_events(date)
+        return cache[key]
+
+    circadian_lighting._async_get_sun_events = cached_sun_events
+
+
+async def _no_platform(*args, **kwargs):
+    """The sensor platform is not part of the replay."""
+
+
+def _default_config(args):
+    lights = [f"light.replay_{i}" for i in range(args.lights)]
+    return {
+        DOMAIN: {},
+        "switches": [
+            {
+                "name": "Replay",
+                "lights_ct": lights[0::4],
+                "lights_rgb": lights[1::4],
+                "lights_xy": lights[2::4],
+                "lights_brightness": lights[3::4],
+            }
+        ],
+        "states": {},
+    }
+
+
+def _daily_schedule(config, switches, rng):
+    """Return a function giving (seconds into the day, entity, state) events."""
+    fixed = []
+    for entity_id, changes in config.get("states", {}).items():
+        for at, state in changes.items():
+            hour, minute = (int(part) for part in str(at).split(":"))
+            fixed.append((hour * 3600 + minute * 60, entity_id, str(state)))
+    scheduled = {entity_id for _, entity_id, _ in fixed}
+    lights = sorted(
+        {light for switch in switches for light in switch._lights} - scheduled
+    )
+
+    def day_events():
+        events = list(fixed)
+        for light in lights:
+            for on_hour, off_hour in PATTERN:
+                for hour, state in ((on_hour, STATE_ON), (off_hour, STATE_OFF)):
+                    jitter = rng.uniform(-JITTER, JITTER) * 60
+                    events.append((hour * 3600 + jitter, light, state))
+        return events
+
+    return lights, fixed, day_events
+
+
+async def replay(args, config):
+    loop = asyncio.get_running_loop()
+    _use_virtual_clock(loop)
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    hass.config.set_time_zone("UTC")
+    hass.config.latitude = args.latitude
+    hass.config.longitude = args.longitude
+    hass.config.elevation = 0
+
+    calls = Counter()
+    per_hour = Counter()
+
+    @callback
+    def light_turn_on(call):
+        entity_ids = call.data["entity_id"]
+        sent = 1 if isinstance(entity_ids, str) else len(entity_ids)
+        calls[int(loop.time())] += sent
+        per_hour[int(loop.time() // 3600)] += sent
+
+    hass.services.async_register("light", "turn_on", light_turn_on)
+
+    component_config = dict(config.get(DOMAIN) or {})
+    if args.interval is not None:
+        component_config["interval"] = args.interval
+    if args.transition is not None:
+        component_config["transition"] = args.transition
+    circadian_lighting_component.async_load_platform = _no_platform
+    await circadian_lighting_component.async_setup(
+        hass, circadian_lighting_component.CONFIG_SCHEMA({DOMAIN: component_config})
+    )
+    circadian_lighting = hass.data[DOMAIN]
+    _cache_sun_events(circadian_lighting)
+
+    updates = 0
+
+    @callback
+    def count_update():
+        nonlocal updates
+        updates += 1
+
+    async_dispatcher_connect(hass, CIRCADIAN_LIGHTING_UPDATE_TOPIC, count_update)
+
+    switches = []
+    for switch_config in config["switches"]:
+        switch_platform.setup_platform(
+            hass,
+            switch_platform.PLATFORM_SCHEMA({"platform": DOMAIN, **switch_config}),
+            switches.extend,
+        )
+
+    rng = random.Random(args.seed)
+    lights, fixed, day_events = _daily_schedule(config, switches, rng)
+    for light in lights:
+        hass.states.async_set(light, STATE_OFF)
+    for _, entity_id, state in sorted(fixed):
+        # The last change of the day is what holds at midnight.
+        hass.states.async_set(entity_id, state)
+    for switch in switches:
+        switch._state = True
+        await switch.async_added_to_hass()
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+
+    @callback
+    def plan_day(now):
+        # Not async_track_utc_time_change: its random microsecond offset
+        # would make runs irreproducible.
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        for offset, entity_id, state in day_events():
+            # A plain function would be run in an executor thread.
+            set_state = callback(
+                lambda _, entity_id=entity_id, state=state: hass.states.async_set(
+                    entity_id, state
+                )
+            )
+            event_helper.async_track_point_in_utc_time(
+                hass, set_state, midnight + timedelta(seconds=offset)
+            )
+        event_helper.async_track_point_in_utc_time(
+            hass, plan_day, midnight + timedelta(days=1)
+        )
+
+    plan_day(dt_util.utcnow())
+
+    wall_start = time.perf_counter()
+    await asyncio.sleep(args.days * 86400)
+    compute_time = time.perf_counter() - wall_start
+
+    total = sum(calls.values())
+    print(f"simulated:           {args.days} day(s), {len(switches)} switch(es),"
+          f" {len(lights)} light(s)")
+    print(f"updates dispatched:  {updates}")
+    print(f"total service calls: {total}")
+    print(f"commands per hour:   {total / (args.days * 24):.1f} avg,"
+          f" {max(per_hour.values(), default=0)} peak")
+    print(f"peak burst size:     {max(calls.values(), default=0)}")
+    print(f"compute time:        {compute_time:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", type=Path)
+    parser.add_argument("--days", type=int, default=1)
+    parser.add_argument("--year", type=int, default=2025)
+    parser.add_argument("--interval", type=int)
+    parser.add_argument("--transition", type=float)
+    parser.add_argument("--lights", type=int, default=20)
+    parser.add_argument("--latitude", type=float, default=52.37)
+    parser.add_argument("--longitude", type=float, default=4.89)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.config is not None:
+        config = yaml.safe_load(args.config.read_text())
+    else:
+        config = _default_config(args)
+
+    start = datetime(args.year, 1, 1, tzinfo=timezone.utc).timestamp()
+    loop = VirtualTimeLoop(start)
+    try:
+        loop.run_until_complete(replay(args, config))
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()